@@ -1,12 +1,44 @@
 import json
+import os
 import subprocess
 import hashlib
+import pickle
 
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from src.agent.security import SecurityPromptGenerator
+
+# pygit2 reads the repository in-process; fall back to the git CLI without it
+try:
+	import pygit2
+
+	PYGIT2_AVAILABLE = True
+except ImportError:
+	PYGIT2_AVAILABLE = False
 
 DATA_FOLDER = "./data"
 SECURITY_PROMPT_PATH = "./src/agent/security.py"
+PROMPT_CACHE_PATH = "./data/.prompts.cache.json"
+HASH_ALGO = "blake2b"
+HASH_SERIALIZER = "pickle-5"
+
+
+@lru_cache(maxsize=1)
+def _open_repo():
+	"""
+	Opens the enclosing git repository once per process.
+
+	Returns:
+	        pygit2.Repository | None: The repository, or None if pygit2 is
+	        unavailable or no repository encloses the working directory
+	"""
+	if not PYGIT2_AVAILABLE:
+		return None
+
+	repo_path = pygit2.discover_repository(".")
+	if repo_path is None:
+		return None
+	return pygit2.Repository(repo_path)
 
 
 def check_file_committed(filepath):
@@ -27,6 +59,12 @@ def check_file_committed(filepath):
 	if not Path(filepath).exists():
 		raise FileNotFoundError(f"File not found: {filepath}")
 
+	repo = _open_repo()
+	if repo is not None:
+		relpath = Path(filepath).resolve().relative_to(Path(repo.workdir).resolve())
+		status = repo.status_file(relpath.as_posix())
+		return status in (pygit2.GIT_STATUS_CURRENT, pygit2.GIT_STATUS_IGNORED)
+
 	# Check if file has uncommitted changes
 	status_cmd = ["git", "status", "--porcelain", filepath]
 	status_output = subprocess.check_output(status_cmd, universal_newlines=True).strip()
@@ -35,6 +73,43 @@ def check_file_committed(filepath):
 	return len(status_output) == 0
 
 
+def _parse_branch(refs):
+	"""
+	Extracts the checked-out branch from a `git log --format=%D` ref list.
+
+	Args:
+	        refs (str): Decoration string such as "HEAD -> main, origin/main"
+
+	Returns:
+	        str | None: Branch name, or None when there is no "HEAD -> " entry
+	        (detached head, or branch decorations hidden by log.excludeDecoration)
+	"""
+	for ref in refs.split(", "):
+		if ref.startswith("HEAD -> "):
+			return ref[len("HEAD -> ") :]
+	return None
+
+
+def _symbolic_branch():
+	"""
+	Resolves the checked-out branch with `git symbolic-ref`, which unlike
+	`git log` decorations is not affected by decoration config.
+
+	Returns:
+	        str: Branch name, or "HEAD" when the head is detached
+	"""
+	result = subprocess.run(
+		["git", "symbolic-ref", "--short", "-q", "HEAD"],
+		stdout=subprocess.PIPE,
+		universal_newlines=True,
+	)
+	# Exit status 1 means HEAD is detached
+	if result.returncode == 1:
+		return "HEAD"
+	result.check_returncode()
+	return result.stdout.strip()
+
+
 def get_git_info():
 	"""
 	Retrieves current git repository information including commit hash,
@@ -47,42 +122,139 @@ def get_git_info():
 	        subprocess.CalledProcessError: If git commands fail
 	        FileNotFoundError: If git is not installed or directory is not a git repository
 	"""
-	try:
-		# Get the current commit hash
-		hash_cmd = ["git", "rev-parse", "HEAD"]
-		commit_hash = subprocess.check_output(hash_cmd, universal_newlines=True).strip()
+	repo = _open_repo()
+	if repo is not None:
+		try:
+			commit = repo[repo.head.target]
+			branch = "HEAD" if repo.head_is_detached else repo.head.shorthand
+			commit_tz = timezone(timedelta(minutes=commit.commit_time_offset))
+			date_str = datetime.fromtimestamp(commit.commit_time, tz=commit_tz).strftime(
+				"%Y-%m-%d %H:%M:%S %z"
+			)
 
-		# Get the current branch name
-		branch_cmd = ["git", "rev-parse", "--abbrev-ref", "HEAD"]
-		branch = subprocess.check_output(branch_cmd, universal_newlines=True).strip()
+			return {"hash": str(commit.id), "branch": branch, "date": date_str}
+		except (pygit2.GitError, KeyError) as e:
+			raise Exception(
+				"Failed to get git information. Make sure you're in a git repository and git is installed."
+			) from e
 
-		# Get the commit date
-		date_cmd = ["git", "log", "-1", "--format=%cd", "--date=iso"]
-		date_str = subprocess.check_output(date_cmd, universal_newlines=True).strip()
+	try:
+		# Hash, ref decorations and commit date of HEAD in a single git call
+		log_cmd = ["git", "log", "-1", "--format=%H%n%D%n%cd", "--date=iso", "HEAD"]
+		log_output = subprocess.check_output(log_cmd, universal_newlines=True)
+		commit_hash, refs, date_str = log_output.strip("\n").split("\n", 2)
 
-		return {"hash": commit_hash, "branch": branch, "date": date_str}
-	except (subprocess.CalledProcessError, FileNotFoundError) as e:
+		return {
+			"hash": commit_hash.strip(),
+			"branch": _parse_branch(refs.strip()) or _symbolic_branch(),
+			"date": date_str.strip(),
+		}
+	except (subprocess.CalledProcessError, FileNotFoundError, ValueError) as e:
 		raise Exception(
 			"Failed to get git information. Make sure you're in a git repository and git is installed."
 		) from e
 
 
-# Only security prompts now
-security_default_prompts = SecurityPromptGenerator.get_default_prompts()
+def write_text_atomic(filepath, text):
+	"""
+	Writes text to a file through a temporary file and an atomic rename, so
+	readers never observe a partially written file.
+
+	Args:
+	        filepath (Path): Destination file
+	        text (str): Content to write
+	"""
+	tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
+	tmp_path.write_text(text)
+	os.replace(tmp_path, filepath)
+
+
+def hash_prompts(prompts):
+	"""
+	Computes the change-detection hash of a prompts dictionary.
+
+	Args:
+	        prompts (dict): Prompts to hash
+
+	Returns:
+	        str: Hex digest of the serialized prompts
+	"""
+	# The hash only needs deterministic bytes, the readable JSON is written separately
+	return hashlib.blake2b(pickle.dumps(prompts, protocol=5), digest_size=16).hexdigest()
+
+
+def load_security_prompts():
+	"""
+	Loads the default security prompts and their hash, reusing an on-disk
+	cache while the prompt source file is unchanged.
+
+	The cache is keyed by the source file's mtime and size. If either
+	differs, a digest of the source bytes decides whether the file really
+	changed before the prompts are regenerated. Entries written with a
+	different HASH_ALGO or HASH_SERIALIZER are ignored.
+
+	Returns:
+	        tuple[dict, str]: The security prompts and their hash
+	"""
+	source_path = Path(SECURITY_PROMPT_PATH)
+	cache_path = Path(PROMPT_CACHE_PATH)
+	stat = source_path.stat()
+
+	try:
+		cache = json.loads(cache_path.read_text())
+	except (FileNotFoundError, json.JSONDecodeError):
+		cache = {}
+
+	# A hash produced by a different algorithm or serializer is stale
+	if cache.get("hash_algo") != HASH_ALGO or cache.get("hash_serializer") != HASH_SERIALIZER:
+		cache = {}
+
+	if cache.get("mtime_ns") == stat.st_mtime_ns and cache.get("size") == stat.st_size:
+		return cache["prompts"], cache["hash"]
+
+	source_hash = hashlib.blake2b(source_path.read_bytes(), digest_size=16).hexdigest()
+	if cache.get("source_hash") == source_hash:
+		prompts, prompt_hash = cache["prompts"], cache["hash"]
+	else:
+		# Only security prompts now
+		from src.agent.security import SecurityPromptGenerator
+
+		prompts = SecurityPromptGenerator.get_default_prompts()
+		prompt_hash = hash_prompts(prompts)
+
+	cache = {
+		"mtime_ns": stat.st_mtime_ns,
+		"size": stat.st_size,
+		"source_hash": source_hash,
+		"hash_algo": HASH_ALGO,
+		"hash_serializer": HASH_SERIALIZER,
+		"hash": prompt_hash,
+		"prompts": prompts,
+	}
+	write_text_atomic(cache_path, json.dumps(cache))
+
+	return prompts, prompt_hash
+
 
 if __name__ == "__main__":
 	check_file_committed(SECURITY_PROMPT_PATH)
 
-	security_prompt_hash = hashlib.md5(
-		json.dumps(security_default_prompts, sort_keys=True).encode()
-	).hexdigest()
+	security_default_prompts, security_prompt_hash = load_security_prompts()
 
 	data = {
 		"security": security_default_prompts,
 		"git_info": get_git_info(),
 		"security_prompt_hash": security_prompt_hash,
+		"security_prompt_hash_algo": HASH_ALGO,
+		"security_prompt_hash_serializer": HASH_SERIALIZER,
 	}
 
 	filepath = Path(DATA_FOLDER) / "prompts.json"
-	filepath.write_text(json.dumps(data, indent=4))
-	print(f"Completed, wrote into {filepath}")
\ No newline at end of file
+	content = json.dumps(data, indent=4)
+
+	# Leave the file (and its mtime) untouched when nothing changed
+	if filepath.exists() and filepath.read_text() == content:
+		print(f"Completed, {filepath} already up to date")
+	else:
+		write_text_atomic(filepath, content)
+		print(f"Completed, wrote into {filepath}")
\ No newline at end of file
@@ -1,7 +1,6 @@
 import asyncio
 import os
 import json
-import inquirer
 import time
 import uvicorn
 from contextlib import asynccontextmanager
@@ -19,18 +18,16 @@ from src.client.rag import RAGClient
 from src.sensor.security import SecuritySensor
 from src.sensor.interface import SecuritySensorInterface
 from src.db import DBInterface
-from src.rpc_config import FlexibleRPCConfig
+from src.rpc_config import get_rpc_config
 from src.agent.security import SecurityAgent, SecurityPromptGenerator
 from src.datatypes import StrategyData
 from src.container import ContainerManager
-from src.helper import services_to_envs, services_to_prompts
+from src.helper import invalidate_env_cache, services_to_envs, services_to_prompts
 from src.genner import get_genner
 from src.genner.Base import Genner
 from src.client.openrouter import OpenRouter
 from src.summarizer import get_summarizer
-from anthropic import Anthropic
-import docker
-from functools import partial
+from functools import lru_cache, partial
 from src.flows.security import assisted_flow as security_assisted_flow
 from src.constants import SERVICE_TO_ENV
 from src.manager import fetch_default_prompt
@@ -131,18 +128,40 @@ def auto_select_model():
     else:
         raise Exception("No valid AI models available - check your API keys")
 
+@lru_cache(maxsize=1)
+def get_openrouter_client() -> Optional[OpenRouter]:
+    """Build the OpenRouter client once, or None if OPENROUTER_API_KEY is not set"""
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        return None
+    return OpenRouter(
+        base_url="https://openrouter.ai/api/v1",
+        api_key=api_key,
+        include_reasoning=True,
+    )
+
+@lru_cache(maxsize=1)
+def get_anthropic_client():
+    """Build the Anthropic client once, or None if ANTHROPIC_API_KEY is not set"""
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+    from anthropic import Anthropic
+    
+    return Anthropic(api_key=api_key)
+
+def reset_ai_clients():
+    """Drop cached AI clients so the next lookup picks up changed API keys"""
+    get_openrouter_client.cache_clear()
+    get_anthropic_client.cache_clear()
+
 def setup_ai_genner(model_choice: str):
     """Setup AI generator based on model choice"""
     backend_name = get_model_backend(model_choice)
     logger.info(f"🤖 Initializing AI: {model_choice} → {backend_name}")
     
-    or_client = OpenRouter(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-        include_reasoning=True,
-    ) if os.getenv("OPENROUTER_API_KEY") else None
-    
-    anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY")) if os.getenv("ANTHROPIC_API_KEY") else None
+    or_client = get_openrouter_client()
+    anthropic_client = get_anthropic_client()
     
     if backend_name in ["gemini", "qwq", "openai"] and model_choice.endswith("(openrouter)"):
         if not or_client:
@@ -314,6 +333,8 @@ async def initialize_enhanced_security_system(fe_data: dict):
     logger.info("✅ Security Sensor initialized")
     
     # Setup Container Manager
+    import docker
+    
     container_manager = ContainerManager(
         docker.from_env(),
         "unified-security-executor", 
@@ -343,9 +364,8 @@ async def initialize_enhanced_security_system(fe_data: dict):
         logger.info("🔗 SecurityAgent ↔ EdgeLearningEngine connected")
     
     # Connect Sensor to Agent
-    if hasattr(sensor, 'set_security_agent'):
-        sensor.set_security_agent(security_agent)
-        logger.info("🔗 SecuritySensor ↔ SecurityAgent connected")
+    sensor.set_security_agent(security_agent)
+    logger.info("🔗 SecuritySensor ↔ SecurityAgent connected")
     
     security_agent.sensor = sensor
     logger.info("🔗 SecuritySensor connected to SecurityAgent for module access")
@@ -360,13 +380,12 @@ async def initialize_enhanced_security_system(fe_data: dict):
             background_monitor = None
     
     # Start Real-Time Incoming Transaction Monitoring
-    if hasattr(sensor, 'start_incoming_monitor'):
-        try:
-            await sensor.start_incoming_monitor()
-            logger.info("✅ Real-time incoming transaction monitoring started!")
-            logger.info("📥 Auto-quarantine system active for suspicious incoming tokens/NFTs")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not start incoming monitoring: {e}")
+    try:
+        await sensor.start_incoming_monitor()
+        logger.info("✅ Real-time incoming transaction monitoring started!")
+        logger.info("📥 Auto-quarantine system active for suspicious incoming tokens/NFTs")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not start incoming monitoring: {e}")
     
     logger.info("🚀 Enhanced Security System Initialization Complete!")
     logger.info("⚡ Transactions now use instant cached intelligence!")
@@ -374,7 +393,7 @@ async def initialize_enhanced_security_system(fe_data: dict):
 
 def setup_security_sensor() -> SecuritySensorInterface:
     """Setup security sensor with flexible RPC configuration"""
-    rpc_config = FlexibleRPCConfig()
+    rpc_config = get_rpc_config()
     primary_url, provider_name, all_endpoints, api_key = rpc_config.detect_and_configure_rpc()
     
     monitored_wallets = []
@@ -958,6 +977,8 @@ async def legacy_engine_status():
 # ========== ENHANCED USER CONFIGURATION ==========
 def starter_prompt():
     """Enhanced interactive configuration for security system"""
+    import inquirer
+    
     questions = [
         inquirer.Text("agent_name", message="Security Agent Name:", default="VaultGuard"),
         inquirer.List(
@@ -978,6 +999,7 @@ def starter_prompt():
     os.environ["ENABLE_BACKGROUND_MONITOR"] = str(answers["enable_background_monitor"]).lower()
     os.environ["ENABLE_EDGE_LEARNING"] = str(answers["enable_edge_learning"]).lower()
     os.environ["JUPITER_API_ENABLED"] = str(answers["enable_jupiter_integration"]).lower()
+    invalidate_env_cache()
     
     logger.info("🛡️ Starting Enhanced AI Security System...")
     logger.info(f"🤖 AI Model: {answers['model']}")
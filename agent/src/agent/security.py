@@ -17,6 +17,10 @@ from src.sensor.security import SecuritySensor
 from src.types import ChatHistory, Message
 from src.db import DBInterface
 
+# Markdown code fences in AI responses
+_PYTHON_BLOCK_RE = re.compile(r"```python\n(.*?)\n```", re.DOTALL)
+_GENERIC_BLOCK_RE = re.compile(r"```\n(.*?)\n```", re.DOTALL)
+
 class SecurityPromptGenerator:
     """
     Generates AI prompts for security analysis using chain-of-thought reasoning.
@@ -736,15 +740,13 @@ class SecurityAgent:
     
     def _extract_python_code(self, response: str) -> str:
         """Extract Python code from AI response"""
-        import re
-        
         # Try to find Python code blocks
-        python_matches = re.findall(r"```python\n(.*?)\n```", response, re.DOTALL)
+        python_matches = _PYTHON_BLOCK_RE.findall(response)
         if python_matches:
             return python_matches[0].strip()
         
         # Try to find generic code blocks
-        code_matches = re.findall(r"```\n(.*?)\n```", response, re.DOTALL)
+        code_matches = _GENERIC_BLOCK_RE.findall(response)
         if code_matches:
             return code_matches[0].strip()
         
@@ -3,13 +3,16 @@ Security Flows - Replaces Trading Flows
 Follows exact same workflow pattern as trading_assisted_flow but for security operations
 """
 
+import itertools
 import json
+import re
 from datetime import timedelta
+from functools import lru_cache
 from textwrap import dedent
-from typing import Callable, List
+from typing import Callable, List, Tuple
 
 from loguru import logger
-from result import UnwrapError
+from result import Result, UnwrapError
 from dateutil import parser
 from src.agent.security import SecurityAgent
 from src.datatypes import (
@@ -20,42 +23,80 @@ from src.datatypes import (
 from src.helper import nanoid
 from src.types import ChatHistory
 
+# Dashes and curly quotes that LLMs emit in place of their ASCII counterparts
+_UNICODE_FIX = str.maketrans({'\u2013': '-', '\u2014': '-', '\u201c': '"', '\u201d': '"'})
+# Separator lines (any type: ---- or ════ or ──── ) around code in AI responses
+_SEP_PATTERNS = tuple(re.compile(p) for p in (r'─{10,}', r'-{10,}', r'={10,}', r'_{10,}'))
+_SEP_ANCHORED_RE = re.compile(r'(?:─{10,}|-{10,}|={10,}|_{10,})')
+_CODE_BLOCK_RE = re.compile(r'```(?:python)?\s*\n(.*?)\n```', re.DOTALL)
+# Lines that open a script, and explanatory lines that follow the code
+_START_RE = re.compile(r'(?:#!/usr/bin/env python|import |from |def main\(\)|def run_|def analyze_|def check_)')
+_EXPLAIN_RE = re.compile(
+    r'(?:Usage Notes:|How the|Chain of|This code|The script|Before running|NOTE:|Explanation:'
+    r'|You can extend|Install required|Set the environment)'
+)
+_EXPLAIN_LINE_RE = re.compile(r'^\s*' + _EXPLAIN_RE.pattern, re.MULTILINE)
+# Usage tokens in generated code and the import each one needs
+_TOKEN_TO_IMPORT = {
+    're.': 'import re', 'regex': 'import re', 'match(': 'import re',
+    'os.': 'import os', 'getenv': 'import os',
+    'json.': 'import json', 'dumps(': 'import json', 'loads(': 'import json',
+    'time.': 'import time', 'sleep(': 'import time',
+    'requests.': 'import requests', 'get(': 'import requests', 'post(': 'import requests',
+    'logging.': 'import logging',
+    'load_dotenv': 'from dotenv import load_dotenv',
+}
+_IMPORT_PROBE_RE = re.compile('|'.join(map(re.escape, _TOKEN_TO_IMPORT)))
+# One bit per candidate import, assigned in sorted order so walking the bits
+# from low to high yields the imports sorted
+_IMPORT_BIT = {line: 1 << i for i, line in enumerate(sorted(set(_TOKEN_TO_IMPORT.values())))}
+_IMPORTS_BY_BIT = {bit: line for line, bit in _IMPORT_BIT.items()}
+_TOKEN_TO_BIT = {token: _IMPORT_BIT[line] for token, line in _TOKEN_TO_IMPORT.items()}
+_DOTENV_BIT = _IMPORT_BIT['from dotenv import load_dotenv']
+# Keywords that mark text as Python code
+_PY_INDICATOR_RE = re.compile(r'import |def |print\(|if |for |class |return |try:')
+
+@lru_cache(maxsize=256)
 def extract_python_code(ai_response: str) -> str:
-    """Final bulletproof extraction - handles all patterns and includes imports"""
-    import re
-    
+    """Final bulletproof extraction - handles all patterns and includes imports.
+    Results are memoized so retried or repeated responses skip the extraction pass."""
     # Fix Unicode characters first
-    response = ai_response.replace('–', '-').replace('—', '-').replace('"', '"').replace('"', '"')
+    response = ai_response.translate(_UNICODE_FIX)
     
-    # Look for separator lines (any type: ---- or ════ or ──── )
-    separator_patterns = [r'─{10,}', r'-{10,}', r'={10,}', r'_{10,}']
+    # Fast path - the response is already a bare script with nothing to cut away
+    stripped = response.lstrip()
+    if (_START_RE.match(stripped)
+            and '```' not in response
+            and _SEP_ANCHORED_RE.search(response) is None
+            and _EXPLAIN_LINE_RE.search(stripped) is None):
+        return _complete_python_code(stripped.rstrip())
     
-    for sep_pattern in separator_patterns:
-        parts = re.split(sep_pattern, response)
+    # Look for markdown code blocks first - the usual LLM output and a single regex pass
+    if '```' in response:
+        for match in _CODE_BLOCK_RE.findall(response):
+            cleaned = match.strip()
+            if _is_valid_python_code(cleaned):
+                return _complete_python_code(cleaned)
+    
+    # Look for separator lines (any type: ---- or ════ or ──── )
+    # Each separator type is tried on its own so mixed separators still yield a candidate
+    for sep_re in _SEP_PATTERNS:
+        parts = sep_re.split(response)
         if len(parts) >= 3:  # Text, Code, Text
             potential_code = parts[1].strip()
             if _is_valid_python_code(potential_code):
                 return _complete_python_code(potential_code)
     
-    # Look for markdown code blocks
-    code_block_pattern = r'```(?:python)?\s*\n(.*?)\n```'
-    matches = re.findall(code_block_pattern, response, re.DOTALL)
-    if matches:
-        for match in matches:
-            cleaned = match.strip()
-            if _is_valid_python_code(cleaned):
-                return _complete_python_code(cleaned)
-    
     # Find Python code by scanning line by line
     lines = response.split('\n')
     start_idx = None
     end_idx = len(lines)
     
     # Find start - look for shebang, imports, or main functions
+    start_match = _START_RE.match
     for i, line in enumerate(lines):
         line_stripped = line.strip()
-        if (line_stripped.startswith(('#!/usr/bin/env python', 'import ', 'from ')) or
-            line_stripped.startswith(('def main()', 'def run_', 'def analyze_', 'def check_'))):
+        if start_match(line_stripped):
             start_idx = i
             break
     
@@ -69,16 +110,16 @@ def extract_python_code(ai_response: str) -> str:
     
     # Find end - stop at explanatory text
     if start_idx is not None:
-        for i in range(start_idx + 10, len(lines)):  # Start checking after some lines
-            line_stripped = lines[i].strip()
-            if (line_stripped.startswith(('Usage Notes:', 'How the', 'Chain of', 'This code',
-                                        'The script', 'Before running', 'NOTE:', 'Explanation:',
-                                        'You can extend', 'Install required', 'Set the environment')) and
-                not line_stripped.startswith('#')):
+        sep_match = _SEP_ANCHORED_RE.match
+        explain_match = _EXPLAIN_RE.match
+        scan_from = start_idx + 10  # Start checking after some lines
+        for i, line in enumerate(itertools.islice(lines, scan_from, None), start=scan_from):
+            line_stripped = line.strip()
+            if explain_match(line_stripped) and not line_stripped.startswith('#'):
                 end_idx = i
                 break
             # Stop at separator lines
-            if any(re.match(pattern, line_stripped) for pattern in separator_patterns):
+            if sep_match(line_stripped) is not None:
                 end_idx = i
                 break
     
@@ -101,12 +142,11 @@ def _is_valid_python_code(code: str) -> bool:
         return False
     
     # Must contain Python keywords
-    python_indicators = ['import ', 'def ', 'print(', 'if ', 'for ', 'class ', 'return ', 'try:']
-    if not any(indicator in code for indicator in python_indicators):
+    if _PY_INDICATOR_RE.search(code) is None:
         return False
     
-    # Check for shebang or imports at the start
-    lines = code.strip().split('\n')
+    # Check for shebang or imports at the start - only the first 10 lines are inspected
+    lines = code.strip().split('\n', 10)[:10]
     first_few_lines = ' '.join(lines[:5]).lower()
     if ('#!/usr/bin/env python' in first_few_lines or 
         'import ' in first_few_lines or 
@@ -119,79 +159,139 @@ def _is_valid_python_code(code: str) -> bool:
     
     return False
 
+def _iter_bits(mask: int):
+    """Yield the set bits of mask, lowest first"""
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit
+
 def _complete_python_code(code: str) -> str:
     """Ensure the Python code has all necessary imports and structure"""
+    # Work on the stripped code so the line indices found below hold in the result
+    code = code.strip()
     if not code:
         return code
     
-    lines = code.split('\n')
-    
-    # Check what imports we need
-    needed_imports = set()
+    # Check what imports we need - one scan over the code for all usage tokens
+    needed_mask = 0
+    for hit in _IMPORT_PROBE_RE.findall(code):
+        needed_mask |= _TOKEN_TO_BIT[hit]
     
-    # Scan for usage of modules
-    full_code = '\n'.join(lines)
-    if 're.' in full_code or 'regex' in full_code or 'match(' in full_code:
-        needed_imports.add('import re')
-    if 'os.' in full_code or 'getenv' in full_code:
-        needed_imports.add('import os')  
-    if 'json.' in full_code or 'dumps(' in full_code or 'loads(' in full_code:
-        needed_imports.add('import json')
-    if 'time.' in full_code or 'sleep(' in full_code:
-        needed_imports.add('import time')
-    if 'requests.' in full_code or 'get(' in full_code or 'post(' in full_code:
-        needed_imports.add('import requests')
-    if 'logging.' in full_code:
-        needed_imports.add('import logging')
-    if 'load_dotenv' in full_code:
-        needed_imports.add('from dotenv import load_dotenv')
+    lines = code.split('\n')
     
-    # Find existing imports
-    existing_imports = set()
+    # Find existing imports, and where the import block ends (for load_dotenv())
+    existing_mask = 0
     import_end_idx = 0
+    dotenv_idx = 0
     
     for i, line in enumerate(lines):
         stripped = line.strip()
         if stripped.startswith(('import ', 'from ')):
-            existing_imports.add(stripped)
-            import_end_idx = i + 1
+            existing_mask |= _IMPORT_BIT.get(stripped, 0)
+            import_end_idx = dotenv_idx = i + 1
         elif stripped.startswith('#!/'):
             import_end_idx = i + 1
         elif stripped and not stripped.startswith('#'):
             break
     
     # Add missing imports
-    missing_imports = needed_imports - existing_imports
+    missing_mask = needed_mask & ~existing_mask
     
-    if missing_imports:
+    if missing_mask:
         # Insert missing imports after existing imports
-        new_lines = lines[:import_end_idx]
-        new_lines.extend(sorted(missing_imports))
+        result_lines = lines[:import_end_idx]
+        result_lines.extend(_IMPORTS_BY_BIT[bit] for bit in _iter_bits(missing_mask))
+        dotenv_idx = len(result_lines)
         if import_end_idx < len(lines):
-            new_lines.extend([''] + lines[import_end_idx:])
-        lines = new_lines
-    
-    # Ensure proper structure
-    result = '\n'.join(lines).strip()
+            result_lines.extend([''] + lines[import_end_idx:])
+    else:
+        # Nothing to insert, the code is already in its final layout
+        result_lines = lines
     
-    # Add load_dotenv() call if missing but import exists
-    if 'from dotenv import load_dotenv' in result and 'load_dotenv()' not in result:
-        # Find where to insert load_dotenv()
-        result_lines = result.split('\n')
-        insert_idx = 0
-        
-        # Find end of imports
-        for i, line in enumerate(result_lines):
-            if line.strip().startswith(('import ', 'from ')):
-                insert_idx = i + 1
-            elif line.strip() and not line.strip().startswith('#'):
-                break
-        
-        # Insert load_dotenv() call
-        result_lines.insert(insert_idx, '\nload_dotenv()')
-        result = '\n'.join(result_lines)
+    # Add load_dotenv() call after the imports if missing but import exists
+    has_dotenv = 'from dotenv import load_dotenv' in code or missing_mask & _DOTENV_BIT
+    if has_dotenv and 'load_dotenv()' not in code:
+        result_lines.insert(dotenv_idx, '\nload_dotenv()')
     
-    return result
+    return '\n'.join(result_lines)
+
+def _gen_with_retries(
+	agent: SecurityAgent,
+	new_ch: ChatHistory,
+	step_name: str,
+	gen_first: Callable[[], Tuple[Result, ChatHistory]],
+	record: Callable[[ChatHistory], None],
+	container_name: str | None = None,
+	warn_on_empty: bool = False,
+	attempts: int = 3,
+) -> Tuple[bool, str, str, ChatHistory]:
+	"""
+	Generate a flow step's output, regenerating on errors up to `attempts` times.
+
+	The first attempt calls `gen_first`; later attempts ask the agent to regenerate
+	from the accumulated errors. When `container_name` is given the output is treated
+	as code: it is extracted and run in the container, and failures there also
+	trigger a regeneration.
+
+	Args:
+	    agent (SecurityAgent): The security agent to use
+	    new_ch (ChatHistory): Latest chat history, used for regeneration
+	    step_name (str): Human-readable step name for logging
+	    gen_first (Callable[[], Tuple[Result, ChatHistory]]): Produces the first attempt
+	    record (Callable[[ChatHistory], None]): Records a generated chat history
+	    container_name (str | None): Container run name if the output is code to execute
+	    warn_on_empty (bool): Warn when regenerating from an empty instruction/response
+	    attempts (int): Maximum number of attempts
+
+	Returns:
+	    Tuple[bool, str, str, ChatHistory]: Success flag, generated output, code
+	    execution output (empty unless code was run), and the latest chat history
+	"""
+	output = ""
+	code_output = ""
+	err_acc = ""
+	regen = False
+	for _ in range(attempts):
+		try:
+			if regen:
+				logger.info(f"Regenning on {step_name}...")
+				latest_response = new_ch.get_latest_response()
+
+				if warn_on_empty:
+					if new_ch.get_latest_instruction() == "":
+						logger.warning("No instruction found on chat history")
+					if latest_response == "":
+						logger.warning("No response found on chat history")
+
+				output = agent.regen_on_error(
+					errors=err_acc,
+					latest_response=latest_response,
+				).unwrap()
+			else:
+				output_result, new_ch = gen_first()
+				output = output_result.unwrap()
+
+			record(new_ch)
+
+			if container_name is not None:
+				logger.info(f"Running the resulting {step_name} in container...")
+				# 🔧 FIX: Extract Python code before execution
+				output = extract_python_code(output)
+				code_output, _ = agent.container_manager.run_code_in_con(
+					output, container_name
+				).unwrap()
+			return True, output, code_output, new_ch
+		except UnwrapError as e:
+			e = e.result.err()
+			if regen:
+				logger.error(f"Regen failed on {step_name}, err: \n{e}")
+			else:
+				logger.error(f"Failed on first {step_name}, err: \n{e}")
+			regen = True
+			err_acc += f"\n{str(e)}"
+
+	return False, output, code_output, new_ch
 
 def assisted_flow(
 	agent: SecurityAgent,
@@ -241,13 +341,16 @@ def assisted_flow(
 
 	metric_fn = agent.sensor.get_metric_fn(metric_name)
 	start_metric_state = metric_fn()
+	# Serialized once, reused by the prompts and the DB writes below
+	start_metric_str = str(start_metric_state)
+	start_metric_json = json.dumps(start_metric_state)
 
 	if metric_name == "security":
 		agent.db.insert_wallet_snapshot(
 			snapshot_id=f"{nanoid(4)}-{session_id}-security",
 			agent_id=agent.agent_id,
 			total_value_usd=start_metric_state.get("security_score", 0.0) * 100,  # Convert security score to percentage
-			assets=str(start_metric_state),
+			assets=start_metric_str,
 		)
 
 	if notif_str:
@@ -268,7 +371,7 @@ def assisted_flow(
 		else:
 			related_strategies = []
 
-		if related_strategies and len(related_strategies) > 0:
+		if related_strategies:
 			logger.info(f"Found {len(related_strategies)} related security strategies")
 			most_related_strat = related_strategies[0]
 			
@@ -304,7 +407,7 @@ def assisted_flow(
 	rag_start_metric_state = rag_result["start_metric_state"]
 	rag_end_metric_state = rag_result["end_metric_state"]
 
-	if len(rag_errors) > 0:
+	if rag_errors:
 		for error in rag_errors:
 			logger.error(error)
 
@@ -320,71 +423,40 @@ def assisted_flow(
 		time=time,
 		metric_name=metric_name,
 		network=network,
-		metric_state=str(start_metric_state),
+		metric_state=start_metric_str,
 	)
 	agent.chat_history += new_ch
 	for_training_chat_history += new_ch
 
 	logger.info("Initialized system prompt")
 
-	logger.info("Attempt to generate security analysis code...")
-	analysis_code = ""
-	err_acc = ""
-	regen = False
-	success = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Attempt to regenerate security analysis code...")
-
-				if new_ch.get_latest_instruction() == "":
-					logger.warning("No instruction found on chat history")
-				if new_ch.get_latest_response() == "":
-					logger.warning("No response found on chat history")
-
-				analysis_code_result = agent.regen_on_error(
-					errors=err_acc,
-					latest_response=new_ch.get_latest_response(),
-				)
-				analysis_code = analysis_code_result.unwrap()
-			else:
-				if not prev_strat:
-					analysis_code_result, new_ch = agent.gen_analysis_code_on_first(
-						apis=apis, network=network
-					)
-					analysis_code = analysis_code_result.unwrap()
-				else:
-					analysis_code_result, new_ch = agent.gen_analysis_code(
-						notifications_str=notif_str if notif_str else "Fresh",
-						apis=apis,
-						prev_analysis=prev_strat.summarized_desc if prev_strat else "No previous analysis available",
-						rag_summary=rag_summary,
-						before_metric_state=rag_start_metric_state,
-						after_metric_state=rag_end_metric_state,
-					)
-					analysis_code = analysis_code_result.unwrap()
-
-			agent.chat_history += new_ch
-			for_training_chat_history += new_ch
-
-			logger.info("Running the resulting security analysis code in container...")
-			# 🔧 FIX 1: Extract Python code before execution
-			analysis_code = extract_python_code(analysis_code)
-			code_execution_result = agent.container_manager.run_code_in_con(
-				analysis_code, "security_analysis_code"
-			)
-			analysis_code_output, _ = code_execution_result.unwrap()
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on security analysis code, err: \n{e}")
-			else:
-				logger.error(f"Failed on first security analysis code, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
+	def record_both(ch: ChatHistory):
+		nonlocal for_training_chat_history
+		agent.chat_history += ch
+		for_training_chat_history += ch
+
+	def record_training(ch: ChatHistory):
+		nonlocal for_training_chat_history
+		# Temporarily avoid new chat to reduce cost
+		for_training_chat_history += ch
+
+	def gen_analysis_code():
+		if not prev_strat:
+			return agent.gen_analysis_code_on_first(apis=apis, network=network)
+		return agent.gen_analysis_code(
+			notifications_str=notif_str if notif_str else "Fresh",
+			apis=apis,
+			prev_analysis=prev_strat.summarized_desc if prev_strat else "No previous analysis available",
+			rag_summary=rag_summary,
+			before_metric_state=rag_start_metric_state,
+			after_metric_state=rag_end_metric_state,
+		)
 
+	logger.info("Attempt to generate security analysis code...")
+	success, _, analysis_code_output, new_ch = _gen_with_retries(
+		agent, new_ch, "security analysis code", gen_analysis_code, record_both,
+		container_name="security_analysis_code", warn_on_empty=True,
+	)
 	if not success:
 		logger.error("Failed generating output of security analysis code after 3 times...")
 		return
@@ -393,42 +465,17 @@ def assisted_flow(
 	logger.info(f"Security analysis output: \n{analysis_code_output}")
 
 	logger.info("Generating security strategy based on analysis...")
-	strategy_output = ""
-	err_acc = ""
-	regen = False
-	success = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Regenning on security strategy...")
-				strategy_result = agent.regen_on_error(
-					errors=err_acc,
-					latest_response=new_ch.get_latest_response(),
-				)
-				strategy_output = strategy_result.unwrap()
-			else:
-				strategy_result, new_ch = agent.gen_security_strategy(
-					analysis_results=analysis_code_output,
-					apis=apis,
-					before_metric_state=str(start_metric_state),
-					network=network,
-					time=time,
-				)
-				strategy_output = strategy_result.unwrap()
-
-			agent.chat_history += new_ch
-			for_training_chat_history += new_ch
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on security strategy, err: \n{e}")
-			else:
-				logger.error(f"Failed on first security strategy, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
-
+	success, strategy_output, _, new_ch = _gen_with_retries(
+		agent, new_ch, "security strategy",
+		lambda: agent.gen_security_strategy(
+			analysis_results=analysis_code_output,
+			apis=apis,
+			before_metric_state=start_metric_str,
+			network=network,
+			time=time,
+		),
+		record_both,
+	)
 	if not success:
 		logger.error("Failed generating security strategy after 3 times...")
 		return
@@ -437,52 +484,21 @@ def assisted_flow(
 	logger.info(f"Security strategy: \n{strategy_output}")
 
 	logger.info("Generating threat intelligence research...")
-	threat_research_output = ""
-	err_acc = ""
-	regen = False
-	success = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Regenning on threat intelligence research...")
-				threat_research_result = agent.regen_on_error(
-					errors=err_acc,
-					latest_response=new_ch.get_latest_response(),
-				)
-				threat_research_output = threat_research_result.unwrap()
-			else:
-				# Generate code to research threat intelligence for identified threats
-				threat_research_result, new_ch = agent.gen_analysis_code(
-					notifications_str=f"Research threat intelligence for: {strategy_output[:200]}...",
-					apis=apis,
-					prev_analysis="Threat intelligence research",
-					rag_summary="Researching known threat patterns and scammer addresses",
-					before_metric_state=str(start_metric_state),
-					after_metric_state=str(start_metric_state),
-				)
-				threat_research_output = threat_research_result.unwrap()
-
-			agent.chat_history += new_ch
-			for_training_chat_history += new_ch
-
-			logger.info("Running threat intelligence research code in container...")
-			# 🔧 FIX 2: Extract Python code before execution
-			threat_research_output = extract_python_code(threat_research_output)
-			code_execution_result = agent.container_manager.run_code_in_con(
-				threat_research_output, "threat_intelligence_research"
-			)
-			threat_research_code_output, _ = code_execution_result.unwrap()
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on threat intelligence research, err: \n{e}")
-			else:
-				logger.error(f"Failed on first threat intelligence research, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
-
+	threat_notif_str = f"Research threat intelligence for: {strategy_output[:200]}..."
+	success, _, threat_research_code_output, new_ch = _gen_with_retries(
+		agent, new_ch, "threat intelligence research",
+		# Generate code to research threat intelligence for identified threats
+		lambda: agent.gen_analysis_code(
+			notifications_str=threat_notif_str,
+			apis=apis,
+			prev_analysis="Threat intelligence research",
+			rag_summary="Researching known threat patterns and scammer addresses",
+			before_metric_state=start_metric_str,
+			after_metric_state=start_metric_str,
+		),
+		record_both,
+		container_name="threat_intelligence_research",
+	)
 	if not success:
 		logger.error("Failed generating threat intelligence research after 3 times...")
 		return
@@ -491,59 +507,20 @@ def assisted_flow(
 	logger.info(f"Threat intelligence research: \n{threat_research_code_output}")
 
 	logger.info("Generating security implementation code (quarantine/block actions)")
-	quarantine_code = ""
-	err_acc = ""
-	code_output = ""
-	success = False
-	regen = False
-	for i in range(3):
-		try:
-			if regen:
-				logger.info("Regenning on security implementation code...")
-
-				if new_ch.get_latest_instruction() == "":
-					logger.warning("No instruction found on chat history")
-				if new_ch.get_latest_response() == "":
-					logger.warning("No response found on chat history")
-
-				quarantine_code_result = agent.regen_on_error(
-					errors=err_acc,
-					latest_response=new_ch.get_latest_response(),
-				)
-				quarantine_code = quarantine_code_result.unwrap()
-			else:
-				quarantine_code_result, new_ch = agent.gen_quarantine_code(
-					strategy_output=strategy_output,
-					apis=apis,
-					metric_state=str(start_metric_state),
-					security_tools=security_tools,
-					meta_swap_api_url=meta_swap_api_url,
-					network=network,
-				)
-				quarantine_code = quarantine_code_result.unwrap()
-
-			# Temporarily avoid new chat to reduce cost
-			# agent.chat_history += new_ch
-			for_training_chat_history += new_ch
-
-			logger.info("Running the resulting security implementation code in container...")
-			# 🔧 FIX 3: Extract Python code before execution
-			quarantine_code = extract_python_code(quarantine_code)
-			code_execution_result = agent.container_manager.run_code_in_con(
-				quarantine_code, "security_implementation_code"
-			)
-			quarantine_code_output, _ = code_execution_result.unwrap()
-			success = True
-			break
-		except UnwrapError as e:
-			e = e.result.err()
-			if regen:
-				logger.error(f"Regen failed on security implementation code, err: \n{e}")
-			else:
-				logger.error(f"Failed on first security implementation code, err: \n{e}")
-			regen = True
-			err_acc += f"\n{str(e)}"
-
+	success, quarantine_code, quarantine_code_output, new_ch = _gen_with_retries(
+		agent, new_ch, "security implementation code",
+		lambda: agent.gen_quarantine_code(
+			strategy_output=strategy_output,
+			apis=apis,
+			metric_state=start_metric_str,
+			security_tools=security_tools,
+			meta_swap_api_url=meta_swap_api_url,
+			network=network,
+		),
+		record_training,
+		container_name="security_implementation_code",
+		warn_on_empty=True,
+	)
 	if not success:
 		logger.info("Failed generating output of security implementation code after 3 times...")
 	else:
@@ -554,17 +531,18 @@ def assisted_flow(
 	agent.db.insert_chat_history(session_id, for_training_chat_history)
 
 	end_metric_state = metric_fn()
+	end_metric_json = json.dumps(end_metric_state)
 	agent.db.insert_wallet_snapshot(
 		snapshot_id=f"{nanoid(8)}-{session_id}-security",
 		agent_id=agent.agent_id,
 		total_value_usd=end_metric_state.get("security_score", 0.0) * 100,  # Convert security score to percentage
-		assets=json.dumps(end_metric_state),
+		assets=end_metric_json,
 	)
 
 	summarized_state_change = dedent(f"""
-        Security Status Before: {str(start_metric_state).replace("\n", "")}
+        Security Status Before: {start_metric_json}
         Security Score Before: {start_metric_state.get("security_score", 0.0)}
-        Security Status After: {str(end_metric_state).replace("\n", "")}
+        Security Status After: {end_metric_json}
         Security Score After: {end_metric_state.get("security_score", 0.0)}
         Threats Detected: {end_metric_state.get("total_threats_detected", 0)}
         Items Quarantined: {end_metric_state.get("quarantined_items", 0)}
@@ -589,8 +567,8 @@ def assisted_flow(
 				"apis": apis,
 				"security_tools": security_tools,
 				"metric_name": metric_name,
-				"start_metric_state": json.dumps(start_metric_state),
-				"end_metric_state": json.dumps(end_metric_state),
+				"start_metric_state": start_metric_json,
+				"end_metric_state": end_metric_json,
 				"summarized_state_change": summarized_state_change,
 				"summarized_code": summarized_code,
 				"code_output": quarantine_code_output,
@@ -1,48 +1,80 @@
 from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+import ctypes
 import os
 import signal
+import sys
+import threading
 import re
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from src.constants import SERVICE_TO_PROMPT, SERVICE_TO_ENV
-import string
-import random
+import secrets
 import httpx
 
+# Service mappings keyed by interned names, so lookups with interned names
+# (e.g. from string literals) resolve on identity
+_SERVICE_PROMPTS: Dict[str, str] = {
+	sys.intern(service): prompt for service, prompt in SERVICE_TO_PROMPT.items()
+}
+# SERVICE_TO_ENV with immutable variable lists, for cached lookups
+_FLAT_ENV: Dict[str, Tuple[str, ...]] = {
+	sys.intern(platform): tuple(env_vars) for platform, env_vars in SERVICE_TO_ENV.items()
+}
+# services_to_envs results, keyed by (platforms, _env_version)
+_env_cache: Dict[Tuple[Tuple[str, ...], int], Dict[str, str]] = {}
+_env_version = 0
+# The latest timestamp of a source is compared again for every later notification
+# from it, so memoize parsing instead of re-parsing it each time
+_parse_iso = lru_cache(maxsize=1024)(datetime.fromisoformat)
+
 
 @contextmanager
 def timeout(seconds: int):
     """
     Context manager that raises a TimeoutError if the code inside the context takes longer than the specified time.
-    Windows-compatible version using threading instead of signals.
+    Uses SIGALRM when available and running on the main thread. Otherwise (Windows, worker threads) a timer
+    thread injects the TimeoutError into the calling thread, which raises once it next executes Python code.
     """
-    import threading
-    import time as time_module
-    
-    class TimeoutException(Exception):
-        pass
-    
+    if hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread():
+        def alarm_handler(signum, frame):
+            raise TimeoutError(f"Execution timed out after {seconds} seconds")
+
+        previous_handler = signal.signal(signal.SIGALRM, alarm_handler)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        return
+
+    thread_id = ctypes.c_ulong(threading.get_ident())
+    fired = threading.Event()
+
     def timeout_handler():
-        time_module.sleep(seconds)
-        raise TimeoutError(f"Execution timed out after {seconds} seconds")
-    
-    # Start timeout thread
-    timeout_thread = threading.Thread(target=timeout_handler, daemon=True)
-    timeout_thread.start()
-    
+        fired.set()
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, ctypes.py_object(TimeoutError))
+
+    timer = threading.Timer(seconds, timeout_handler)
+    timer.daemon = True
+    timer.start()
     try:
         yield
     finally:
-        # Thread will be cleaned up automatically as it's a daemon thread
-        pass
+        timer.cancel()
+        timer.join()
+        if fired.is_set():
+            # Drop the injected exception if it has not been raised yet
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, None)
 
 
 def extract_content(text: str, block_name: str) -> str:
 	"""
 	Extract content between custom XML-like tags.
 
-	This function uses regular expressions to find and extract content between
-	specified XML-like tags in the input text.
+	This function finds the first opening tag in the input text and returns the
+	content up to the next matching closing tag, with surrounding whitespace removed.
 
 	Args:
 	    text (str): The input text containing XML-like blocks
@@ -56,16 +88,119 @@ def extract_content(text: str, block_name: str) -> str:
 	    >>> extract_content(text, "ASdasdas")
 	    'content1'
 	"""
-	if block_name == "":
+	# An empty block name (the genners' default `blocks=[""]`) means "use the whole text"
+	if not block_name:
 		return text
 
-	pattern = rf"<{block_name}>\s*(.*?)\s*</{block_name}>"
-
-	# Search for the pattern in the text
-	match = re.search(pattern, text, re.DOTALL)
+	# Split after the first opening tag, then before the next closing tag
+	_, open_tag, rest = text.partition(f"<{block_name}>")
+	if not open_tag:
+		return ""
+	content, close_tag, _ = rest.partition(f"</{block_name}>")
 
 	# Return the content if found, empty string otherwise
-	return match.group(1).strip() if match else ""
+	return content.strip() if close_tag else ""
+
+
+def extract_content_from(text: str, block_name: str, start: int = 0) -> Tuple[str, int]:
+	"""
+	Extract content between custom XML-like tags, searching from an offset.
+
+	Works like `extract_content`, but starts looking for the opening tag at `start`
+	and also returns where the block ends. Callers pulling several blocks that appear
+	in order can pass the previous end as the next start, so the text before it is
+	not scanned again.
+
+	Args:
+	    text (str): The input text containing XML-like blocks
+	    block_name (str): The name of the block to extract content from
+	    start (int): Offset in `text` to start searching from
+
+	Returns:
+	    Tuple[str, int]: The content between the specified tags and the offset just
+	    past the closing tag, or ("", start) if not found
+
+	Example:
+	    >>> text = "<thinking>plan</thinking><action>run</action>"
+	    >>> thinking, end = extract_content_from(text, "thinking")
+	    >>> extract_content_from(text, "action", end)
+	    ('run', 45)
+	"""
+	if not block_name:
+		return text[start:], len(text)
+
+	open_tag = f"<{block_name}>"
+	close_tag = f"</{block_name}>"
+
+	# Find the first opening tag and the first closing tag after it
+	content_start = text.find(open_tag, start)
+	if content_start < 0:
+		return "", start
+	content_start += len(open_tag)
+	content_end = text.find(close_tag, content_start)
+	if content_end < 0:
+		return "", start
+
+	return text[content_start:content_end].strip(), content_end + len(close_tag)
+
+
+@lru_cache(maxsize=128)
+def _open_tags_pattern(block_names: Tuple[str, ...]) -> re.Pattern:
+	"""Compile one regex matching the opening tag of any of the given blocks."""
+	# Longest names first so a name that prefixes another cannot shadow it
+	names = sorted(block_names, key=len, reverse=True)
+	return re.compile("<(" + "|".join(map(re.escape, names)) + ")>")
+
+
+def extract_many(text: str, block_names: Tuple[str, ...]) -> Dict[str, str]:
+	"""
+	Extract the content of several XML-like blocks from the same text.
+
+	Opening tags for all blocks are located in a single pass over the text, then
+	each block's closing tag is searched for from its opening tag. The result for
+	each block is the same as `extract_content(text, block_name)`.
+
+	Args:
+	    text (str): The input text containing XML-like blocks
+	    block_names (Tuple[str, ...]): The names of the blocks to extract content from
+
+	Returns:
+	    Dict[str, str]: Mapping of block name to its content, or an empty string if not found
+
+	Example:
+	    >>> extract_many("<thinking>plan</thinking>\n<action>run</action>", ("thinking", "action"))
+	    {'thinking': 'plan', 'action': 'run'}
+	"""
+	results = {name: "" for name in block_names}
+	if "" in results:
+		results[""] = text
+
+	pending = {name for name in block_names if name}
+	if not pending:
+		return results
+
+	for match in _open_tags_pattern(tuple(sorted(pending))).finditer(text):
+		name = match.group(1)
+		if name not in pending:
+			continue
+		pending.discard(name)
+
+		end = text.find(f"</{name}>", match.end())
+		if end >= 0:
+			results[name] = text[match.end():end].strip()
+		if not pending:
+			break
+
+	return results
+
+
+def _check_supported(platforms: List[str], mapping: Dict[str, object]) -> None:
+	"""Raise a ValueError listing every platform missing from `mapping`."""
+	if mapping.keys() >= set(platforms):
+		return
+
+	unknown = [platform for platform in platforms if platform not in mapping]
+	raise ValueError(f"Unsupported platform(s): {unknown}. Supported: {sorted(mapping)}")
 
 
 def services_to_prompts(services: List[str]) -> List[str]:
@@ -81,13 +216,22 @@ def services_to_prompts(services: List[str]) -> List[str]:
 	Returns:
 	    List[str]: List of detailed prompt descriptions for each service
 
+	Raises:
+	    ValueError: If a service is not supported
+
 	Example:
 	    >>> services_to_prompts(["Twitter", "CoinGecko"])
 	    ['Twitter (using tweepy, env vars TWITTER_API_KEY, ...)', 'CoinGecko (env vars COINGECKO_API_KEY) ...']
 	"""
-	service_to_prompt = SERVICE_TO_PROMPT
+	return list(_prompts_cached(tuple(services)))
 
-	return [service_to_prompt[service] for service in services]
+
+@lru_cache(maxsize=256)
+def _prompts_cached(services: Tuple[str, ...]) -> Tuple[str, ...]:
+	"""Prompt descriptions for a combination of services, memoized per combination."""
+	_check_supported(services, _SERVICE_PROMPTS)
+
+	return tuple(_SERVICE_PROMPTS[service] for service in services)
 
 
 def services_to_envs(platforms: List[str]) -> Dict[str, str]:
@@ -96,7 +240,8 @@ def services_to_envs(platforms: List[str]) -> Dict[str, str]:
 
 	This function takes a list of platform names and returns a dictionary
 	containing all the required environment variables and their values for
-	those platforms. It retrieves the values from the system environment.
+	those platforms. It retrieves the values from the system environment and
+	caches them until `invalidate_env_cache` is called.
 
 	Args:
 	    platforms (List[str]): List of platform/service names
@@ -111,29 +256,45 @@ def services_to_envs(platforms: List[str]) -> Dict[str, str]:
 	    >>> services_to_envs(["Twitter", "CoinGecko"])
 	    {'TWITTER_API_KEY': 'key_value', 'TWITTER_API_KEY_SECRET': 'secret_value', ...}
 	"""
-	env_var_mapping: Dict[str, List[str]] = SERVICE_TO_ENV
+	key = (tuple(platforms), _env_version)
+	env_values = _env_cache.get(key)
+	if env_values is None:
+		# Create dictionary of environment variables and their values
+		environ = os.environ
+		env_values = {env_var: environ.get(env_var, "") for env_var in _required_vars(key[0])}
+		_env_cache[key] = env_values
 
-	final_dict = {}
-	for platform in platforms:
-		if platform not in env_var_mapping:
-			raise ValueError(
-				f"Unsupported platform: {platform}. Supported platforms: {', '.join(env_var_mapping.keys())}"
-			)
+	# Hand out a copy so callers cannot modify the cached values
+	return dict(env_values)
+
+
+def invalidate_env_cache() -> None:
+	"""
+	Drop the environment values cached by `services_to_envs`.
+
+	Call this after changing os.environ so the next lookup reads the new values.
+	Results built concurrently under the previous version are never served again.
+	"""
+	global _env_version
+	_env_version += 1
+	_env_cache.clear()
 
-		# Create dictionary of environment variables and their values
-		final_dict.update(
-			{env_var: os.getenv(env_var, "") for env_var in env_var_mapping[platform]}
-		)
 
-	return final_dict
+@lru_cache(maxsize=128)
+def _required_vars(platforms: Tuple[str, ...]) -> Tuple[str, ...]:
+	"""Environment variables needed by the given platforms, deduplicated in first-seen order."""
+	# Validate every platform before reading any environment variables
+	_check_supported(platforms, _FLAT_ENV)
+
+	return tuple(dict.fromkeys(env_var for platform in platforms for env_var in _FLAT_ENV[platform]))
 
 
 def get_latest_notifications_by_source(notifications: List[Dict]) -> List[Dict]:
 	"""
 	Get the latest notification for each source based on the created timestamp.
 
-	This function groups notifications by their source, then for each source,
-	finds the most recent notification based on the 'created' timestamp.
+	This function makes a single pass over the notifications, keeping the most
+	recent notification per source based on the 'created' timestamp.
 
 	Args:
 	    notifications (List[Dict]): List of notification dictionaries, each containing
@@ -152,30 +313,34 @@ def get_latest_notifications_by_source(notifications: List[Dict]) -> List[Dict]:
 	    [{"source": "Twitter", "created": "2023-01-02T12:00:00", "message": "Tweet 2"},
 	     {"source": "Email", "created": "2023-01-01T10:00:00", "message": "Email 1"}]
 	"""
-	# Group notifications by source
-	source_groups: Dict[str, List[Dict]] = {}
+	# Keep the latest (created, notification) pair seen so far for each source
+	latest: Dict[str, Tuple[str, Dict]] = {}
 	for notif in notifications:
 		source = notif["source"]
-		if source not in source_groups:
-			source_groups[source] = []
-		source_groups[source].append(notif)
+		created = notif["created"]
+		current = latest.get(source)
+		if current is None or _is_newer(created, current[0]):
+			latest[source] = (created, notif)
+
+	return [notif for _, notif in latest.values()]
 
-	# Get latest notification for each source
-	latest_notifications = []
-	for source, notifs in source_groups.items():
-		# Sort notifications by created timestamp in descending order
-		sorted_notifs = sorted(
-			notifs, key=lambda x: datetime.fromisoformat(x["created"]), reverse=True
-		)
-		# Add the first (latest) notification
-		latest_notifications.append(sorted_notifs[0])
 
-	return latest_notifications
+def _is_newer(created: str, other: str) -> bool:
+	"""
+	Check whether ISO 8601 timestamp `created` is later than `other`.
+
+	Same-length UTC ("Z") timestamps share one fixed-width layout and are compared
+	as plain strings; anything else is parsed with (memoized) `datetime.fromisoformat`.
+	"""
+	if len(created) == len(other) and created.endswith("Z") and other.endswith("Z"):
+		return created > other
+	return _parse_iso(created) > _parse_iso(other)
 
 
 def nanoid(size=21) -> str:
 	"""Generates a random string of a given size.
-	The string is composed of ASCII letters and digits.
+	The string is composed of ASCII letters and digits, drawn from a
+	cryptographically secure source.
 
 	Examples:
 		>>> nanoid()
@@ -190,7 +355,11 @@ def nanoid(size=21) -> str:
 		str: Random string of the given size
 	"""
 
-	alphabet = string.ascii_letters + string.digits
-	return "".join(random.choice(alphabet) for _ in range(size))
+	# URL-safe base64 is letters, digits, "-" and "_"; drop the last two and
+	# draw again in the (practically impossible) case too few characters remain
+	while True:
+		token = secrets.token_urlsafe(size * 2).replace("-", "").replace("_", "")
+		if len(token) >= size:
+			return token[:size]
 
 
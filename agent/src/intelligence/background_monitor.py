@@ -53,6 +53,16 @@ class BlacklistedWallet:
     confidence: float
     sources: List[str]
 
+# Optional DB methods the monitor uses when the backing database provides them
+_OPTIONAL_DB_METHODS = (
+    'delete_old_threats',
+    'fetch_blacklisted_wallets',
+    'get_recent_threats',
+    'insert_blacklisted_wallet',
+    'insert_threat_intelligence',
+    'update_monitoring_statistics',
+)
+
 class EnhancedBackgroundIntelligenceMonitor:
     """
     Enhanced Background Intelligence Monitor - Integrated with EdgeLearningEngine
@@ -63,6 +73,9 @@ class EnhancedBackgroundIntelligenceMonitor:
         self.db = db
         self.rag = rag
         self.edge_learning_engine = edge_learning_engine
+        self.db_features = frozenset(
+            name for name in _OPTIONAL_DB_METHODS if callable(getattr(db, name, None))
+        )
         
         self.config = {
             'monitor_interval': int(os.getenv('MONITOR_INTERVAL', 600)),  # 10 minutes
@@ -70,6 +83,7 @@ class EnhancedBackgroundIntelligenceMonitor:
             'wallet_tracking_interval': int(os.getenv('WALLET_INTERVAL', 1800)),  # 30 minutes
             'threat_update_interval': int(os.getenv('THREAT_UPDATE_INTERVAL', 10800)),  # 3 hours
             'cache_update_interval': int(os.getenv('CACHE_UPDATE_INTERVAL', 300)),  # 5 minutes
+            'solana_rpc_url': os.getenv('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com'),
         }
         
         self.blacklisted_wallets: Dict[str, BlacklistedWallet] = {}
@@ -81,6 +95,7 @@ class EnhancedBackgroundIntelligenceMonitor:
         self.monitoring_active = False
         self.monitoring_tasks = []
         self.cache_update_queue = asyncio.Queue(maxsize=1000)
+        self.threat_event = asyncio.Event()
         
         self.stats = {
             'threats_discovered': 0,
@@ -217,7 +232,7 @@ class EnhancedBackgroundIntelligenceMonitor:
     async def _load_blacklisted_wallets(self):
         """Load existing blacklisted wallets from database"""
         try:
-            if hasattr(self.db, 'fetch_blacklisted_wallets'):
+            if 'fetch_blacklisted_wallets' in self.db_features:
                 blacklist_data = self.db.fetch_blacklisted_wallets()
                 
                 for wallet_data in blacklist_data:
@@ -314,13 +329,22 @@ class EnhancedBackgroundIntelligenceMonitor:
                     logger.info(f"🧠 Applied {updates_processed} cache updates")
                     self.stats['cache_updates_sent'] += updates_processed
                 
-                await asyncio.sleep(self.config['cache_update_interval'])
+                await self._wait_for_threat(self.config['cache_update_interval'])
                 
             except Exception as e:
                 logger.error(f"❌ Cache update processor error: {e}")
                 self.stats['rate_limit_hits'] += 1
                 await asyncio.sleep(self.config['cache_update_interval'])
 
+    async def _wait_for_threat(self, timeout: float):
+        """Sleep up to `timeout` seconds, waking early when a new threat update is queued"""
+        try:
+            await asyncio.wait_for(self.threat_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.threat_event.clear()
+
     async def _apply_cache_update(self, cache_update: Dict):
         """Apply a cache update to EdgeLearningEngine - ENHANCED for instant blocking"""
         try:
@@ -605,6 +629,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                     
                     try:
                         self.cache_update_queue.put_nowait(cache_update)
+                        self.threat_event.set()
                         logger.debug(f"🧠 Queued cache update for threat: {threat_type}")
                     except asyncio.QueueFull:
                         logger.warning("⚠️ Cache update queue full - dropping update")
@@ -633,7 +658,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                 
                 self.blacklisted_wallets[address] = wallet
                 
-                if hasattr(self.db, 'insert_blacklisted_wallet'):
+                if 'insert_blacklisted_wallet' in self.db_features:
                     self.db.insert_blacklisted_wallet({
                         'wallet_address': address,
                         'threat_type': threat_type,
@@ -656,6 +681,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                     
                     try:
                         self.cache_update_queue.put_nowait(cache_update)
+                        self.threat_event.set()
                         logger.debug(f"🧠 Queued cache update for blacklisted wallet: {address[:8]}...")
                     except asyncio.QueueFull:
                         logger.warning("⚠️ Cache update queue full - dropping wallet update")
@@ -709,6 +735,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                                     
                                     try:
                                         self.cache_update_queue.put_nowait(cache_update)
+                                        self.threat_event.set()
                                     except asyncio.QueueFull:
                                         logger.warning("⚠️ Cache update queue full - dropping activity update")
                                 
@@ -731,7 +758,7 @@ class EnhancedBackgroundIntelligenceMonitor:
     async def _check_wallet_activity(self, session: aiohttp.ClientSession, address: str) -> Dict:
         """Check if wallet has new activity using Solana RPC"""
         try:
-            url = os.getenv('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.com')
+            url = self.config['solana_rpc_url']
             headers = {'Content-Type': 'application/json'}
             payload = {
                 'jsonrpc': '2.0',
@@ -829,7 +856,7 @@ class EnhancedBackgroundIntelligenceMonitor:
     async def _get_recent_threats(self, hours: int = 3) -> List[ThreatIntelligence]:
         """Get threats discovered in the last N hours"""
         try:
-            if hasattr(self.db, 'get_recent_threats'):
+            if 'get_recent_threats' in self.db_features:
                 return self.db.get_recent_threats(hours=hours)
             return []
         except Exception as e:
@@ -840,7 +867,7 @@ class EnhancedBackgroundIntelligenceMonitor:
         """Clean up old threat intelligence data"""
         try:
             cutoff_date = datetime.now() - timedelta(days=30)
-            if hasattr(self.db, 'delete_old_threats'):
+            if 'delete_old_threats' in self.db_features:
                 deleted = self.db.delete_old_threats(cutoff_date)
                 logger.debug(f"🧹 Cleaned {deleted} threats older than {cutoff_date}")
         except Exception as e:
@@ -946,7 +973,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                 'severity': threat.severity
             }
             
-            if hasattr(self.db, 'insert_threat_intelligence'):
+            if 'insert_threat_intelligence' in self.db_features:
                 self.db.insert_threat_intelligence(threat_data)
             else:
                 logger.debug(f"📝 Would save threat intelligence: {threat.threat_type}")
@@ -971,7 +998,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                 'monitoring_active': self.monitoring_active
             }
             
-            if hasattr(self.db, 'update_monitoring_statistics'):
+            if 'update_monitoring_statistics' in self.db_features:
                 self.db.update_monitoring_statistics(stats_data)
             else:
                 logger.debug(f"📊 Statistics: {self.stats['threats_discovered']} threats, {len(self.blacklisted_wallets)} blacklisted")
@@ -1036,6 +1063,7 @@ class EnhancedBackgroundIntelligenceMonitor:
                 
                 try:
                     self.cache_update_queue.put_nowait(cache_update)
+                    self.threat_event.set()
                     logger.info(f"🧠 Queued cache update for manual threat: {threat.threat_type}")
                 except asyncio.QueueFull:
                     logger.warning("⚠️ Cache update queue full - manual threat may not be cached immediately")
@@ -5,9 +5,19 @@ Uses generic parameters for consistent naming across the system
 """
 
 import os
+import re
 from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
+# Basic URL validation
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
 class FlexibleRPCConfig:
     """
     Smart RPC configuration that supports multiple providers and auto-generates URLs
@@ -120,6 +130,7 @@ class FlexibleRPCConfig:
     
     def _detect_provider(self) -> Optional[Tuple[str, str, str]]:
         """Detect which RPC provider is configured based on environment variables"""
+        env = os.environ
         
         for provider_key, provider_config in self.provider_patterns.items():
             # Check if all required environment variables are present
@@ -128,7 +139,7 @@ class FlexibleRPCConfig:
             
             all_keys_present = True
             for env_key in required_keys:
-                value = os.getenv(env_key)
+                value = env.get(env_key)
                 if not value:
                     all_keys_present = False
                     break
@@ -212,16 +223,7 @@ class FlexibleRPCConfig:
     
     def validate_custom_url(self, url: str) -> bool:
         """Validate if a custom URL is properly formatted"""
-        import re
-        # Basic URL validation
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-            r'localhost|'  # localhost...
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-        return url_pattern.match(url) is not None
+        return _URL_RE.match(url) is not None
     
     def get_configuration_summary(self) -> Dict:
         """Get a summary of current RPC configuration"""
@@ -241,9 +243,10 @@ class FlexibleRPCConfig:
     
     def _get_detected_providers(self) -> List[str]:
         """Get list of providers with available API keys"""
+        env = os.environ
         detected = []
         for provider_key, provider_config in self.provider_patterns.items():
-            if all(os.getenv(key) for key in provider_config['env_keys']):
+            if all(env.get(key) for key in provider_config['env_keys']):
                 detected.append(provider_config['name'])
         return detected
     
@@ -259,23 +262,32 @@ class FlexibleRPCConfig:
             return 'public_fallback'
 
 
+_rpc_config: Optional[FlexibleRPCConfig] = None
+
+
+def get_rpc_config() -> FlexibleRPCConfig:
+    """Return the process-wide FlexibleRPCConfig, creating it on first use"""
+    global _rpc_config
+    if _rpc_config is None:
+        _rpc_config = FlexibleRPCConfig()
+    return _rpc_config
+
+
 # Updated SecuritySensor setup function with generic parameters
 def setup_flexible_security_sensor():
     """Setup SecuritySensor with flexible RPC configuration using generic parameters"""
     
     # Initialize RPC configuration
-    rpc_config = FlexibleRPCConfig()
+    rpc_config = get_rpc_config()
     
     # Get optimal RPC configuration (now returns API key too)
     primary_url, provider_name, all_endpoints, api_key = rpc_config.detect_and_configure_rpc()
     
     # Get monitored wallets
-    monitored_wallets = []
-    wallet_env_vars = [key for key in os.environ.keys() if key.startswith("MONITOR_WALLET_")]
-    for wallet_var in wallet_env_vars:
-        wallet_address = os.environ[wallet_var]
-        if wallet_address:
-            monitored_wallets.append(wallet_address)
+    monitored_wallets = [
+        value for key, value in os.environ.items()
+        if key.startswith("MONITOR_WALLET_") and value
+    ]
     
     # Default to demo wallets if none specified
     if not monitored_wallets:
@@ -321,7 +333,7 @@ def setup_security_sensor_with_provider(provider_name: str, api_key: str, monito
     Setup SecuritySensor with specific provider configuration
     Useful for programmatic setup or testing with specific providers
     """
-    rpc_config = FlexibleRPCConfig()
+    rpc_config = get_rpc_config()
     
     # Get provider info
     provider_info = rpc_config.get_provider_info(provider_name)
@@ -361,7 +373,7 @@ def setup_security_sensor_with_provider(provider_name: str, api_key: str, monito
 # Utility function to test RPC configuration
 def test_rpc_configuration():
     """Test current RPC configuration and display results"""
-    rpc_config = FlexibleRPCConfig()
+    rpc_config = get_rpc_config()
     
     logger.info("🔍 Testing RPC Configuration...")
     
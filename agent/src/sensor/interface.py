@@ -25,4 +25,16 @@ class SecuritySensorInterface:
 		"""
 		Returns a callable that fetches a security metric by name.
 		"""
-		...
\ No newline at end of file
+		...
+
+	def set_security_agent(self, security_agent) -> None:
+		"""
+		Connects the sensor to the SecurityAgent that analyzes its transactions.
+		The default implementation does nothing.
+		"""
+
+	async def start_incoming_monitor(self) -> None:
+		"""
+		Starts real-time monitoring of incoming transactions.
+		The default implementation does nothing.
+		"""
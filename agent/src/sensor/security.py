@@ -12,6 +12,8 @@ import requests
 from datetime import datetime, timedelta
 import traceback
 
+from src.sensor.interface import SecuritySensorInterface
+
 # FIXED IMPORTS - Capture specific errors instead of silent failures
 module_import_errors = {}
 
@@ -81,7 +83,7 @@ except ImportError as e:
     SOLANA_WEB3_AVAILABLE = False
     print(f"❌ solana-py not available: {e}")
 
-class SecuritySensor:
+class SecuritySensor(SecuritySensorInterface):
     """
     SecuritySensor with proper error handling and complete transaction parsing
     """
@@ -0,0 +1,12 @@
+from src import rpc_config
+from src.rpc_config import FlexibleRPCConfig, get_rpc_config
+
+
+def test_get_rpc_config_returns_shared_instance(monkeypatch):
+	monkeypatch.setattr(rpc_config, "_rpc_config", None)
+
+	first = get_rpc_config()
+	second = get_rpc_config()
+
+	assert isinstance(first, FlexibleRPCConfig)
+	assert first is second